@@ -1,6 +1,8 @@
+from .aservice import AsyncService as AsyncService
 from .errors import CommitFailed as CommitFailed
 from .errors import MultipleResultsFound as MultipleResultsFound
 from .errors import NotFound as NotFound
 from .errors import ServiceException as ServiceException
 from .service import Service as Service
+from .utils import async_safe_commit as async_safe_commit
 from .utils import safe_commit as safe_commit
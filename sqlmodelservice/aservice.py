@@ -0,0 +1,513 @@
+from collections.abc import AsyncIterator, Iterable, Sequence
+from typing import TYPE_CHECKING, Any, Literal, Type, TypeVar, cast, overload
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import CursorResult, Dialect, RowMapping
+from sqlalchemy.engine.result import ScalarResult, TupleResult
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+from .base import PrimaryKey, ServiceBase, TCreate, TModel, TPrimaryKey, TUpdate, chunks
+from .errors import CommitFailed, MultipleResultsFound, NotFound, ServiceException
+from .utils import async_safe_commit
+
+if TYPE_CHECKING:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+T = TypeVar("T")
+
+
+class AsyncService(ServiceBase[TModel, TCreate, TUpdate, TPrimaryKey]):
+    """
+    Base async service implementation.
+
+    It's the async version of `Service`, a wrapper around `sqlmodel`'s `AsyncSession`.
+    It has the same generic types, hooks, and (awaitable) methods as `Service`.
+
+    Keep in mind that lazy loading is not available with async sessions. Use `_loader_options()`
+    to eagerly load the relationships you need, and consider creating the session with
+    `expire_on_commit=False`.
+    """
+
+    __slots__ = ("_session",)
+
+    def __init__(self, session: "AsyncSession", *, model: Type[TModel]) -> None:
+        """
+        Initialization.
+
+        Arguments:
+            session: The session instance the service will use. When the service is created,
+                it becomes the sole owner of the session, it should only be used through the
+                service from then on.
+            model: The database *table* model.
+        """
+        self._session = session
+        super().__init__(model=model)
+
+    @overload
+    async def add_to_session(
+        self,
+        items: Iterable[TCreate],
+        *,
+        commit: bool = False,
+        operation: Literal["create"],
+        bulk: bool = False,
+        chunk_size: int = 1000,
+    ) -> list[TModel]:
+        ...
+
+    @overload
+    async def add_to_session(
+        self,
+        items: Iterable[tuple[TModel, TUpdate]],
+        *,
+        commit: bool = False,
+        operation: Literal["update"],
+        bulk: bool = False,
+        chunk_size: int = 1000,
+    ) -> list[TModel]:
+        ...
+
+    @overload
+    async def add_to_session(
+        self,
+        items: Iterable[TCreate],
+        *,
+        commit: bool = False,
+        operation: Literal["upsert"],
+        bulk: bool = False,
+        chunk_size: int = 1000,
+    ) -> list[TModel]:
+        ...
+
+    async def add_to_session(
+        self,
+        items: Iterable[TCreate] | Iterable[tuple[TModel, TUpdate]],
+        *,
+        commit: bool = False,
+        operation: Literal["create", "update", "upsert"],
+        bulk: bool = False,
+        chunk_size: int = 1000,
+    ) -> list[TModel]:
+        """
+        Adds all items to the session using the same flow as `create()` or `update()`,
+        depending on the selected `operation`.
+
+        See `Service.add_to_session()` for the details.
+
+        Arguments:
+            items: The items to add to the session.
+            commit: Whether to also commit the changes to the database.
+            operation: The desired operation.
+            bulk: Whether to use bulk statements for the operation if possible.
+            chunk_size: The maximum number of items to process before flushing the session.
+
+        Returns:
+            The list of items that were added to the session.
+
+        Raises:
+            CommitFailed: If the service fails to commit the operation.
+            ValueError: If `chunk_size` is not positive.
+        """
+        session = self._session
+        db_items: list[TModel] = []
+        if operation == "create":
+            items = cast(Iterable[TCreate], items)
+            use_bulk_insert = (
+                bulk and self._get_dialect().insert_executemany_returning and self._can_insert_directly()
+            )
+            prepare_for_create = self._prepare_for_create
+            for chunk in chunks(items, chunk_size):
+                if use_bulk_insert:
+                    db_items.extend(await self._insert_all(chunk))
+                    continue
+
+                chunk_items = [prepare_for_create(item) for item in chunk]
+                db_items.extend(await self._add_all(chunk_items, chunk_size=chunk_size))
+        elif operation == "update":
+            items = cast(Iterable[tuple[TModel, TUpdate]], items)
+            use_bulk_update = bulk and len(self._pk_cols) == 1 and self._can_update_directly()
+            apply_changes_to_item = self._apply_changes_to_item
+            for update_chunk in chunks(items, chunk_size):
+                if use_bulk_update:
+                    db_items.extend(await self._update_all(update_chunk))
+                    continue
+
+                chunk_items = [apply_changes_to_item(item, changes) for item, changes in update_chunk]
+                db_items.extend(await self._add_all(chunk_items, chunk_size=chunk_size))
+        elif operation == "upsert":
+            items = cast(Iterable[TCreate], items)
+            for chunk in chunks(items, chunk_size):
+                db_items.extend(await self._upsert_all(chunk))
+        else:
+            raise ServiceException(f"Unsupported operation: {operation}")
+
+        if commit:
+            await async_safe_commit(session, error_msg="Commit failed.")
+
+        return db_items
+
+    async def all(
+        self,
+        where: ColumnElement[bool] | bool | None = None,
+        *,
+        order_by: Sequence[ColumnElement[Any]] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        unique: bool = False,
+    ) -> Sequence[TModel]:
+        """
+        Returns all items that match the given where clause.
+
+        See `Service.all()` for the details.
+
+        Arguments:
+            where: An optional where clause for the query.
+            order_by: An optional sequence of order by clauses.
+            limit: An optional limit for the number of items to return.
+            offset: The number of items to skip.
+            unique: Whether to remove duplicate items from the result.
+        """
+        stmt = self._apply_clauses(self.select(), where, order_by=order_by, limit=limit, offset=offset)
+        result = await self._session.exec(stmt)
+        return result.unique().all() if unique else result.all()
+
+    async def all_as_dicts(
+        self,
+        where: ColumnElement[bool] | bool | None = None,
+        *,
+        order_by: Sequence[ColumnElement[Any]] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+    ) -> Sequence[RowMapping]:
+        """
+        Returns the column values of all items that match the given where clause.
+
+        See `Service.all_as_dicts()` for the details.
+
+        Arguments:
+            where: An optional where clause for the query.
+            order_by: An optional sequence of order by clauses.
+            limit: An optional limit for the number of items to return.
+            offset: The number of items to skip.
+        """
+        stmt = self._apply_clauses(
+            self._create_columns_select(), where, order_by=order_by, limit=limit, offset=offset
+        )
+        return cast(CursorResult[Any], await self._session.exec(stmt)).mappings().all()
+
+    async def create(self, data: TCreate) -> TModel:
+        """
+        Creates a new database entry from the given data.
+
+        Arguments:
+            data: Creation data.
+
+        Raises:
+            CommitFailed: If the service fails to commit the operation.
+        """
+        session = self._session
+        db_item = self._prepare_for_create(data)
+        session.add(db_item)
+        await async_safe_commit(session, error_msg="Commit failed.")
+        await session.refresh(db_item)
+        return db_item
+
+    async def delete_by_pk(self, pk: TPrimaryKey) -> None:
+        """
+        Deletes the item with the given primary key from the database.
+
+        See `Service.delete_by_pk()` for the details.
+
+        Arguments:
+            pk: The primary key.
+
+        Raises:
+            CommitFailed: If the service fails to commit the operation.
+            NotFound: If the document with the given primary key does not exist.
+        """
+        session = self._session
+        if not self._can_delete_directly():
+            item = await self.get_by_pk(pk)
+            if item is None:
+                raise NotFound(self._format_primary_key(pk))
+
+            await session.delete(item)
+            await async_safe_commit(session, error_msg="Failed to delete item.")
+            return
+
+        stmt = delete(self._model).where(self._pk_clause(pk))
+        # Session synchronization is skipped, because it scans the entire identity map.
+        # The deleted item can only be there under its identity key, so it's looked up directly.
+        try:
+            result = cast(
+                CursorResult[Any], await session.exec(stmt, execution_options={"synchronize_session": False})
+            )
+        except Exception as e:
+            await session.rollback()
+            raise CommitFailed("Failed to delete item.") from e
+
+        if result.rowcount == 0:
+            raise NotFound(self._format_primary_key(pk))
+
+        if (item := session.identity_map.get(self._identity_key(pk))) is not None:
+            session.expunge(item)
+
+        await async_safe_commit(session, error_msg="Failed to delete item.")
+
+    @overload
+    async def exec(self, statement: Select[T]) -> TupleResult[T]:
+        ...
+
+    @overload
+    async def exec(self, statement: SelectOfScalar[T]) -> ScalarResult[T]:
+        ...
+
+    async def exec(self, statement: SelectOfScalar[T] | Select[T]) -> ScalarResult[T] | TupleResult[T]:
+        """
+        Executes the given statement.
+        """
+        return await self._session.exec(statement)  # type: ignore[return-value]
+
+    async def get_by_pk(self, pk: PrimaryKey, *, fresh: bool = False) -> TModel | None:
+        """
+        Returns the item with the given primary key if it exists.
+
+        See `Service.get_by_pk()` for the details.
+
+        Arguments:
+            pk: The primary key.
+            fresh: Whether to load the item from the database even if it's already in the session.
+        """
+        return await self._session.get(self._model, pk, options=self._loader_options(), populate_existing=fresh)
+
+    async def iter_all(
+        self,
+        where: ColumnElement[bool] | bool | None = None,
+        *,
+        order_by: Sequence[ColumnElement[Any]] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[TModel]:
+        """
+        Async iterator over all items that match the given where clause.
+
+        The items are streamed from the database in chunks of `chunk_size` items.
+        The query is executed when the iteration starts.
+
+        The session must not be used for other queries until the iteration is complete.
+
+        Arguments:
+            where: An optional where clause for the query.
+            order_by: An optional sequence of order by clauses.
+            limit: An optional limit for the number of items to return.
+            offset: The number of items to skip.
+            chunk_size: The number of items to fetch from the database at once.
+        """
+        stmt = self._apply_clauses(self.select(), where, order_by=order_by, limit=limit, offset=offset)
+        result = await self._session.stream_scalars(stmt.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            for item in partition:
+                yield item
+
+    async def one(
+        self,
+        where: ColumnElement[bool] | bool,
+    ) -> TModel:
+        """
+        Returns item that matches the given where clause.
+
+        Arguments:
+            where: The where clause of the query.
+
+        Raises:
+            MultipleResultsFound: If multiple items match the where clause.
+            NotFound: If no items match the where clause.
+        """
+        try:
+            return (await self._session.exec(self.select().where(where))).one()
+        except sa_exc.MultipleResultsFound as e:
+            raise MultipleResultsFound("Multiple items matched the where clause.") from e
+        except sa_exc.NoResultFound as e:
+            raise NotFound("No items matched the where clause") from e
+
+    async def one_or_none(
+        self,
+        where: ColumnElement[bool] | bool,
+    ) -> TModel | None:
+        """
+        Returns item that matches the given where clause, if there is such an item.
+
+        Arguments:
+            where: The where clause of the query.
+
+        Raises:
+            MultipleResultsFound: If multiple items match the where clause.
+        """
+        try:
+            return (await self._session.exec(self.select().where(where))).one_or_none()
+        except sa_exc.MultipleResultsFound as e:
+            raise MultipleResultsFound("Multiple items matched the where clause.") from e
+
+    async def refresh(self, instance: TModel) -> None:
+        """
+        Refreshes the given instance from the database.
+        """
+        await self._session.refresh(instance)
+
+    async def update(self, pk: TPrimaryKey, data: TUpdate) -> TModel:
+        """
+        Updates the item with the given primary key.
+
+        See `Service.update()` for the details.
+
+        Arguments:
+            pk: The primary key.
+            data: Update data.
+
+        Raises:
+            CommitFailed: If the service fails to commit the operation.
+            NotFound: If the record with the given primary key does not exist.
+        """
+        if (
+            type(self).update_item is not AsyncService.update_item
+            or not self._can_update_directly()
+            or not self._get_dialect().update_returning
+            or len(changes := self._prepare_for_update(data)) == 0
+        ):
+            item = await self.get_by_pk(pk)
+            if item is None:
+                raise NotFound(self._format_primary_key(pk))
+
+            return await self.update_item(item, data)
+
+        session = self._session
+        stmt = update(self._model).where(self._pk_clause(pk)).values(changes).returning(self._model)
+        try:
+            db_item: TModel | None = cast(CursorResult[Any], await session.exec(stmt)).scalars().one_or_none()
+        except Exception as e:
+            await session.rollback()
+            raise CommitFailed("Update failed.") from e
+
+        if db_item is None:
+            raise NotFound(self._format_primary_key(pk))
+
+        await async_safe_commit(session, error_msg="Update failed.")
+        if session.sync_session.expire_on_commit:
+            await session.refresh(db_item)
+
+        return db_item
+
+    async def update_item(self, item: TModel, data: TUpdate) -> TModel:
+        """
+        Updates the given item.
+
+        The same as `update()` but without data fetching.
+
+        Arguments:
+            item: The item to update.
+            data: Update data.
+
+        Raises:
+            CommitFailed: If the service fails to commit the operation.
+        """
+        session = self._session
+        self._apply_changes_to_item(item, data)
+        session.add(item)
+        await async_safe_commit(session, error_msg="Update failed.")
+
+        await session.refresh(item)
+        return item
+
+    async def _add_all(self, items: list[TModel], *, chunk_size: int) -> list[TModel]:
+        """
+        Adds the given chunk of items to the session, and flushes the session if the chunk is full.
+
+        Arguments:
+            items: The items to add to the session.
+            chunk_size: The chunk size that was used to create the chunk.
+
+        Returns:
+            The received items.
+        """
+        self._session.add_all(items)
+        if len(items) == chunk_size:
+            await self._session.flush()
+
+        return items
+
+    def _get_dialect(self) -> Dialect:
+        """
+        Returns the dialect of the database the service's session is bound to.
+        """
+        return self._session.get_bind(self._model).dialect
+
+    async def _insert_all(self, items: Iterable[TCreate]) -> list[TModel]:
+        """
+        Inserts all the given items using a single bulk `INSERT ... RETURNING` statement.
+
+        The method requires driver support for multi-row `INSERT ... RETURNING` statements.
+
+        Arguments:
+            items: The items to insert.
+
+        Returns:
+            The inserted items.
+        """
+        prepare_for_create_dict = self._prepare_for_create_dict
+        values = [prepare_for_create_dict(item) for item in items]
+        if len(values) == 0:
+            return []
+
+        stmt = insert(self._model).returning(self._model, sort_by_parameter_order=True)
+        return list(cast(CursorResult[Any], await self._session.exec(stmt, params=values)).scalars())
+
+    async def _update_all(self, items: Sequence[tuple[TModel, TUpdate]]) -> list[TModel]:
+        """
+        Updates the given items as described in `_plan_bulk_update()`.
+
+        Arguments:
+            items: The items to update, with the corresponding update data.
+
+        Returns:
+            The received items.
+
+        Raises:
+            StaleDataError: If an update statement didn't match the row of every item it updates.
+        """
+        session = self._session
+        orm_items, statements = self._plan_bulk_update(items, session=session.sync_session)
+        session.add_all(orm_items)
+        for stmt, changes in statements:
+            result = cast(
+                CursorResult[Any], await session.exec(stmt, execution_options={"synchronize_session": False})
+            )
+            self._set_committed_changes(changes, matched=result.rowcount)
+
+        return [item for item, _ in items]
+
+    async def _upsert_all(self, items: Iterable[TCreate]) -> list[TModel]:
+        """
+        Inserts or updates all the given items using a single bulk
+        `INSERT ... ON CONFLICT DO UPDATE ... RETURNING` statement.
+
+        Arguments:
+            items: The items to upsert.
+
+        Returns:
+            The inserted or updated items.
+
+        Raises:
+            ServiceException: If the database dialect doesn't support upserts.
+        """
+        prepare_for_create_dict = self._prepare_for_create_dict
+        values = [prepare_for_create_dict(item) for item in items]
+        if len(values) == 0:
+            return []
+
+        stmt = self._create_upsert(self._get_dialect())
+        # Items that are already in the session must be updated with the returned values.
+        result = await self._session.exec(stmt, params=values, execution_options={"populate_existing": True})
+        return list(cast(CursorResult[Any], result).scalars())
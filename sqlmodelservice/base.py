@@ -0,0 +1,702 @@
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import is_dataclass
+from functools import cache
+from itertools import islice
+from typing import Any, ClassVar, Generic, Type, TypeVar, cast, overload
+
+from pydantic import BaseModel
+from sqlalchemy import Select as SASelect
+from sqlalchemy import Update, and_, case, literal, update
+from sqlalchemy import select as sa_select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Dialect
+from sqlalchemy.orm import Session, class_mapper
+from sqlalchemy.orm.attributes import instance_state, set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlalchemy.sql.dml import ReturningInsert
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import SQLModel, select
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+from .errors import ServiceException
+
+AtomicPrimaryKey = int | str
+PrimaryKey = AtomicPrimaryKey | tuple[AtomicPrimaryKey, ...] | list[AtomicPrimaryKey] | Mapping[str, AtomicPrimaryKey]
+
+T = TypeVar("T")
+TM_1 = TypeVar("TM_1", bound=SQLModel)
+TM_2 = TypeVar("TM_2", bound=SQLModel)
+TM_3 = TypeVar("TM_3", bound=SQLModel)
+TM_4 = TypeVar("TM_4", bound=SQLModel)
+TM_5 = TypeVar("TM_5", bound=SQLModel)
+TM_6 = TypeVar("TM_6", bound=SQLModel)
+
+TModel = TypeVar("TModel", bound=SQLModel)
+TCreate = TypeVar("TCreate", bound=SQLModel)
+TUpdate = TypeVar("TUpdate", bound=SQLModel)
+TPrimaryKey = TypeVar("TPrimaryKey", bound=PrimaryKey)
+TSelect = TypeVar("TSelect", bound=SASelect[Any])
+
+
+def _format_sequence_pk(pk: Sequence[AtomicPrimaryKey]) -> str:
+    """Formats a `tuple` or `list` primary key."""
+    return "|".join(map(str, pk))
+
+
+def _format_mapping_pk(pk: Mapping[str, AtomicPrimaryKey]) -> str:
+    """Formats a `dict` primary key."""
+    return "|".join(f"{k}:{v}" for k, v in pk.items())
+
+
+_pk_formatters: dict[type, Callable[[Any], str]] = {
+    int: str,
+    str: str,
+    tuple: _format_sequence_pk,
+    list: _format_sequence_pk,
+    dict: _format_mapping_pk,
+}
+"""Primary key formatters by primary key type."""
+
+_upsert_inserts: dict[str, Callable[[Any], postgresql.Insert | sqlite.Insert]] = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+"""`INSERT ... ON CONFLICT` statement factories by dialect name."""
+
+
+_nested_value_types = (BaseModel, dict, list, tuple, set, frozenset)
+"""Value types that `model_dump()` may convert, so their dump can't be skipped."""
+
+
+def _has_custom_serialization(schema: Any) -> bool:
+    """Returns whether the given core schema (or any of its sub-schemas) customizes serialization."""
+    if isinstance(schema, dict):
+        return "serialization" in schema or any(_has_custom_serialization(v) for v in schema.values())
+    if isinstance(schema, (list, tuple)):
+        return any(_has_custom_serialization(v) for v in schema)
+
+    return False
+
+
+@cache
+def _get_update_dumper(model: type[BaseModel]) -> Callable[[BaseModel], dict[str, Any]] | None:
+    """
+    Returns a function that is equivalent to `model_dump(exclude_unset=True)` for instances
+    of the given model, if the model's configuration allows it.
+
+    The returned function reads the set fields directly from the instance's `__dict__`
+    instead of going through the serializer. It falls back to `model_dump()` if any of
+    the set values is nested (a model, dataclass, or container) and may be converted.
+
+    Arguments:
+        model: The model class to create the function for.
+
+    Returns:
+        The dump function, or `None` if `model_dump()` must be used for the given model.
+    """
+    if (
+        hasattr(model, "__table__")
+        or model.model_config.get("extra") == "allow"
+        or model.model_computed_fields
+        or any(
+            field.exclude or getattr(field, "exclude_if", None) is not None for field in model.model_fields.values()
+        )
+        or _has_custom_serialization(model.__pydantic_core_schema__)
+    ):
+        return None
+
+    field_names = tuple(model.model_fields)
+
+    def dump(data: BaseModel) -> dict[str, Any]:
+        values = data.__dict__
+        fields_set = data.model_fields_set
+        # Field order is kept, so the same changes always produce the same statement.
+        result = {name: values[name] for name in field_names if name in fields_set}
+        for value in result.values():
+            if isinstance(value, _nested_value_types) or is_dataclass(value):
+                return data.model_dump(exclude_unset=True)
+
+        return result
+
+    return dump
+
+
+@cache
+def _get_unvalidated_factory(model: type[SQLModel]) -> Callable[[BaseModel], Any]:
+    """
+    Returns a function that creates an instance of the given table model from the field values
+    of another (already validated) model, without validation.
+
+    The instance is created by SQLAlchemy's class manager, and its field values are set directly,
+    skipping `__init__()`, the instrumented attributes, and SQLAlchemy's `init` event. The ORM
+    inserts the values of new items from their state, so they are still persisted.
+
+    Arguments:
+        model: The table model class to create the function for.
+    """
+    new_instance = class_mapper(model).class_manager.new_instance
+    field_names = frozenset(model.model_fields)
+
+    def create(data: BaseModel) -> Any:
+        item = new_instance()
+        values = {name: value for name, value in data.__dict__.items() if name in field_names}
+        item.__dict__.update(values)
+        object.__setattr__(item, "__pydantic_fields_set__", set(values))
+        return item
+
+    return create
+
+
+def chunks(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """
+    Splits the given iterable into lists of at most `size` items.
+
+    Arguments:
+        items: The items to split.
+        size: The maximum number of items in a chunk.
+
+    Raises:
+        ValueError: If `size` is not positive.
+    """
+    if size < 1:
+        raise ValueError("Chunk size must be positive.")
+
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class ServiceBase(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
+    """
+    Base class of `Service` and `AsyncService`.
+
+    It implements everything that doesn't depend on the session (statement creation and
+    data conversion hooks), so the sync and async services can share it.
+
+    See `Service` for the description of the generic types.
+
+    Class attributes:
+    - `_skip_validation_on_create`: If `True`, `_prepare_for_create()` creates `TModel` instances
+      without validation, by copying the field values of `TCreate`. Only enable it if `TCreate`
+      is validated and its fields are compatible with `TModel`.
+    """
+
+    __slots__ = (
+        "_base_select",
+        "_column_keys",
+        "_defaulted_keys",
+        "_model",
+        "_pk_cols",
+        "_pk_keys",
+    )
+
+    _skip_validation_on_create: ClassVar[bool] = False
+
+    def __init__(self, *, model: Type[TModel]) -> None:
+        """
+        Initialization.
+
+        Arguments:
+            model: The database *table* model.
+        """
+        self._model = model
+        # Created on first use, so `_loader_options()` can rely on attributes that subclasses set after `__init__()`.
+        self._base_select: SelectOfScalar[SQLModel] | None = None
+
+        # The primary key columns and the corresponding attribute names are needed on most CRUD
+        # paths, so they're resolved only once instead of walking the mapper on every call.
+        mapper = class_mapper(model)
+        self._pk_cols: tuple[ColumnElement[Any], ...] = tuple(mapper.primary_key)
+        self._pk_keys: tuple[str, ...] = tuple(mapper.get_property_by_column(c).key for c in self._pk_cols)
+        self._column_keys: tuple[str, ...] = tuple(attr.key for attr in mapper.column_attrs)
+        # Attributes whose `None` value must not be inserted, so the database can generate their value.
+        self._defaulted_keys = frozenset(self._pk_keys).union(
+            key for key, c in mapper.columns.items() if c.default is not None or c.server_default is not None
+        )
+
+    @overload
+    def select(self) -> SelectOfScalar[TModel]:
+        ...
+
+    @overload
+    def select(self, joined_1: Type[TM_1], /) -> SelectOfScalar[tuple[TModel, TM_1]]:
+        ...
+
+    @overload
+    def select(self, joined_1: Type[TM_1], joined_2: Type[TM_2], /) -> SelectOfScalar[tuple[TModel, TM_1, TM_2]]:
+        ...
+
+    @overload
+    def select(
+        self, joined_1: Type[TM_1], joined_2: Type[TM_2], joined_3: Type[TM_3], /
+    ) -> SelectOfScalar[tuple[TModel, TM_1, TM_2, TM_3]]:
+        ...
+
+    @overload
+    def select(
+        self,
+        joined_1: Type[TM_1],
+        joined_2: Type[TM_2],
+        joined_3: Type[TM_3],
+        joined_4: Type[TM_4],
+        /,
+    ) -> SelectOfScalar[tuple[TModel, TM_1, TM_2, TM_3, TM_4]]:
+        ...
+
+    @overload
+    def select(
+        self,
+        joined_1: Type[TM_1],
+        joined_2: Type[TM_2],
+        joined_3: Type[TM_3],
+        joined_4: Type[TM_4],
+        joined_5: Type[TM_5],
+        /,
+    ) -> SelectOfScalar[tuple[TModel, TM_1, TM_2, TM_3, TM_4, TM_5]]:
+        ...
+
+    @overload
+    def select(
+        self,
+        joined_1: Type[TM_1],
+        joined_2: Type[TM_2],
+        joined_3: Type[TM_3],
+        joined_4: Type[TM_4],
+        joined_5: Type[TM_5],
+        joined_6: Type[TM_6],
+        /,
+    ) -> SelectOfScalar[tuple[TModel, TM_1, TM_2, TM_3, TM_4, TM_5, TM_6]]:
+        ...
+
+    def select(self, *joined: SQLModel) -> SelectOfScalar[SQLModel]:  # type: ignore[misc]
+        """
+        Creates a select statement on the service's table.
+
+        Positional arguments (SQLModel table definitions) will be included in the select statement.
+        You must specify the join condition for each included positional argument though.
+
+        If `joined` is not empty, then a tuple will be returned with `len(joined) + 1` values
+        in it. The first value will be an instance of `TModel`, the rest of the values will
+        correspond to the positional arguments that were passed to the method.
+
+        The loader options returned by `_loader_options()` are applied to the statement.
+
+        Example:
+
+        ```python
+        class A(SQLModel, table=True):
+            id: int | None = Field(primary_key=True)
+            a: str
+
+        class B(SQLModel, table=True):
+            id: int | None = Field(primary_key=True)
+            b: str
+
+        class AService(Service[A, A, A, int]):
+            def __init__(self, session: Session) -> None:
+                super().__init__(session, model=A)
+
+        with Session(engine) as session:
+            a_svc = AService(session)
+            q = a_svc.select(B).where(A.a == B.b)
+            result = svc.exec(q).one()
+            print(result[0])  # A instance
+            print(result[1])  # B instance
+        ```
+        """
+        if joined:
+            return self._create_select(*joined)
+
+        if self._base_select is None:
+            self._base_select = self._create_select()
+
+        return self._base_select
+
+    def _apply_changes_to_item(self, item: TModel, data: TUpdate) -> TModel:
+        """
+        Applies the given changes to the given item without committing anything.
+
+        Arguments:
+            item: The item to update.
+            data: The changes to make to `item`.
+
+        Returns:
+            The received item.
+        """
+        return self._set_changes(item, self._prepare_for_update(data))
+
+    def _apply_clauses(
+        self,
+        stmt: TSelect,
+        where: ColumnElement[bool] | bool | None = None,
+        *,
+        order_by: Sequence[ColumnElement[Any]] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+    ) -> TSelect:
+        """
+        Applies the given clauses to the given select statement.
+
+        Arguments:
+            stmt: The select statement to extend.
+            where: An optional where clause for the query.
+            order_by: An optional sequence of order by clauses.
+            limit: An optional limit for the number of items to return.
+            offset: The number of items to skip.
+        """
+        if where is not None:
+            stmt = stmt.where(where)  # type: ignore[arg-type] # SQLAlchemy coerces bool to true() / false().
+
+        if order_by is not None:
+            stmt = stmt.order_by(*order_by)
+
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        if offset is not None:
+            stmt = stmt.offset(offset)
+
+        return stmt
+
+    def _can_delete_directly(self) -> bool:
+        """
+        Returns whether items of `TModel` can be deleted with a `DELETE` statement, bypassing
+        the ORM's unit of work.
+
+        It's not the case if `TModel` has relationships (whose cascades are applied by the ORM),
+        a version counter, or `before_delete` or `after_delete` listeners.
+        """
+        return not class_mapper(self._model).relationships and not self._has_mapper_hooks(
+            "before_delete", "after_delete"
+        )
+
+    def _can_insert_directly(self) -> bool:
+        """
+        Returns whether items of `TModel` can be created with an `INSERT` statement, bypassing
+        the ORM's unit of work.
+
+        It's not the case if `TModel` has relationships, a version counter, or `before_insert`
+        or `after_insert` listeners.
+        """
+        return not class_mapper(self._model).relationships and not self._has_mapper_hooks(
+            "before_insert", "after_insert"
+        )
+
+    def _can_update_directly(self) -> bool:
+        """
+        Returns whether items of `TModel` can be updated with `UPDATE` statements, bypassing
+        the ORM's unit of work.
+
+        It's not the case if `_apply_changes_to_item()` is overridden, or if `TModel` has a version
+        counter or `before_update` or `after_update` listeners.
+        """
+        return type(self)._apply_changes_to_item is ServiceBase._apply_changes_to_item and not self._has_mapper_hooks(
+            "before_update", "after_update"
+        )
+
+    def _create_columns_select(self) -> Select[Any]:
+        """
+        Creates a select statement on the columns of the service's table, labelled with
+        the corresponding attribute names of `TModel`.
+        """
+        columns = class_mapper(self._model).columns
+        return sa_select(*(column.label(key) for key, column in columns.items()))  # type: ignore[return-value]
+
+    def _create_select(self, *joined: SQLModel) -> SelectOfScalar[SQLModel]:
+        """
+        Creates a new select statement on the service's table, applying the loader options
+        returned by `_loader_options()`.
+
+        Arguments:
+            joined: Additional SQLModel table definitions to include in the select statement.
+        """
+        stmt: SelectOfScalar[SQLModel] = select(self._model, *joined)
+        options = self._loader_options()
+        return stmt.options(*options) if options else stmt
+
+    def _create_upsert(self, dialect: Dialect) -> ReturningInsert[tuple[TModel]]:
+        """
+        Creates an `INSERT ... ON CONFLICT (<primary key>) DO UPDATE ... RETURNING` statement
+        for the given dialect, that overwrites every non-primary key column of existing rows.
+
+        Arguments:
+            dialect: The dialect of the database the statement will be executed on.
+
+        Raises:
+            ServiceException: If the dialect doesn't support upserts.
+        """
+        try:
+            dialect_insert = _upsert_inserts[dialect.name]
+        except KeyError as e:
+            raise ServiceException(f"Upsert is not supported by the {dialect.name} dialect.") from e
+
+        stmt = dialect_insert(self._model)
+        table_columns = class_mapper(self._model).local_table.columns
+        stmt = stmt.on_conflict_do_update(
+            index_elements=self._pk_cols,
+            set_={c.name: stmt.excluded[c.name] for c in table_columns if not c.primary_key},
+        )
+        return stmt.returning(self._model, sort_by_parameter_order=True)
+
+    def _format_primary_key(self, pk: TPrimaryKey) -> str:
+        """
+        Returns the string-formatted version of the primary key.
+
+        Arguments:
+            pk: The primary key to format.
+
+        Raises:
+            ValueError: If formatting fails.
+        """
+        pk_type = type(pk)
+        formatter = _pk_formatters.get(pk_type)
+        if formatter is None:
+            # Subclasses of the supported types, for example enums.
+            formatter = next((_pk_formatters[t] for t in pk_type.__mro__ if t in _pk_formatters), None)
+            if formatter is None:
+                raise ValueError("Unrecognized primary key type.")
+
+        return formatter(pk)
+
+    def _has_mapper_hooks(self, *events: str) -> bool:
+        """
+        Returns whether `TModel` has a version counter or listeners for any of the given mapper
+        events. Only the ORM's unit of work takes these into account.
+
+        Arguments:
+            events: The names of the mapper events to check.
+        """
+        mapper = class_mapper(self._model)
+        dispatch = mapper.dispatch
+        return mapper.version_id_col is not None or any(getattr(dispatch, event) for event in events)
+
+    def _identity_key(self, pk: PrimaryKey) -> Any:
+        """
+        Returns the identity map key of the item with the given primary key.
+
+        Arguments:
+            pk: The primary key.
+
+        Raises:
+            ValueError: If the primary key doesn't match the primary key columns of the model.
+        """
+        return class_mapper(self._model).identity_key_from_primary_key(tuple(self._pk_values(pk)))
+
+    def _loader_options(self) -> Sequence[ORMOption]:
+        """
+        Hook that returns the loader options to apply to every query of `TModel`.
+
+        Override it to configure eager loading of relationships and avoid the N+1 query problem,
+        for example by returning `(selectinload(Parent.children), joinedload(Child.parent))`.
+
+        The hook is not called during initialization. The options of `select()` are resolved
+        when it's first called and reused afterwards, while `get_by_pk()` calls the hook
+        every time.
+
+        The default implementation returns an empty tuple.
+        """
+        return ()
+
+    def _pk_clause(self, pk: PrimaryKey) -> ColumnElement[bool]:
+        """
+        Returns a where clause that matches the item with the given primary key.
+
+        Arguments:
+            pk: The primary key.
+
+        Raises:
+            ValueError: If the primary key doesn't match the primary key columns of the model.
+        """
+        return and_(*(column == value for column, value in zip(self._pk_cols, self._pk_values(pk), strict=True)))
+
+    def _pk_values(self, pk: PrimaryKey) -> list[Any]:
+        """
+        Returns the values of the given primary key in primary key column order.
+
+        Arguments:
+            pk: The primary key.
+
+        Raises:
+            ValueError: If the primary key doesn't match the primary key columns of the model.
+        """
+        if isinstance(pk, Mapping):
+            try:
+                values = [pk[key] for key in self._pk_keys]
+            except KeyError as e:
+                raise ValueError("Incomplete primary key.") from e
+        elif isinstance(pk, (tuple, list)):
+            values = list(pk)
+        else:
+            values = [pk]
+
+        if len(values) != len(self._pk_cols):
+            raise ValueError("Primary key length mismatch.")
+
+        return values
+
+    def _plan_bulk_update(
+        self, items: Sequence[tuple[TModel, TUpdate]], *, session: Session
+    ) -> tuple[list[TModel], list[tuple[Update, list[tuple[TModel, dict[str, Any]]]]]]:
+        """
+        Plans the bulk update of the given items.
+
+        Items that change the same set of attributes are grouped, and a single
+        `UPDATE ... SET column = CASE ... END` statement is created for each group of
+        at least 3 items. The changes of smaller groups, of items that are not persistent in
+        `session`, of items that occur more than once, and of changes that include the primary
+        key are applied to the items, so they can be updated using the default flow.
+
+        The method requires the model to have a single-column primary key, and
+        `_can_update_directly()` to be `True`.
+
+        Arguments:
+            items: The items to update, with the corresponding update data.
+            session: The (sync) session the items must be persistent in to be grouped.
+
+        Returns:
+            The items that must be updated using the default flow, and the update statements
+            with the items and changes they apply.
+        """
+        mapper = class_mapper(self._model)
+        pk_column = self._pk_cols[0]
+        pk_key = self._pk_keys[0]
+
+        prepare_for_update = self._prepare_for_update
+        set_changes = self._set_changes
+        # A CASE expression can only apply one change per item, repeated items keep the ORM's semantics.
+        occurrences = Counter(id(item) for item, _ in items)
+        orm_items: list[TModel] = []
+        groups: dict[frozenset[str], list[tuple[TModel, dict[str, Any]]]] = {}
+        for item, data in items:
+            changes = prepare_for_update(data)
+            state = instance_state(item)
+            if occurrences[id(item)] > 1 or not state.persistent or state.session is not session or pk_key in changes:
+                orm_items.append(set_changes(item, changes))
+            elif len(changes) > 0:
+                groups.setdefault(frozenset(changes), []).append((item, changes))
+
+        statements: list[tuple[Update, list[tuple[TModel, dict[str, Any]]]]] = []
+        for keys, group in groups.items():
+            if len(group) < 3:
+                orm_items.extend(set_changes(item, changes) for item, changes in group)
+                continue
+
+            pks = [getattr(item, pk_key) for item, _ in group]
+            values = {
+                key: case(
+                    *(
+                        (pk_column == pk, literal(changes[key], mapper.columns[key].type))
+                        for pk, (_, changes) in zip(pks, group, strict=True)
+                    ),
+                    else_=mapper.columns[key],
+                )
+                for key in keys
+            }
+            stmt = update(self._model).where(pk_column.in_(pks)).values(values)
+            statements.append((stmt, group))
+
+        return orm_items, statements
+
+    def _prepare_for_create(self, data: TCreate) -> TModel:
+        """
+        Hook that is called before applying creating a model.
+
+        The methods role is to convert certain attributes of the given model's before creating it.
+
+        The default implementation validates `data` with `TModel.model_validate()`, unless
+        `_skip_validation_on_create` is `True`, in which case the `TModel` instance is created
+        without validation and without calling its `__init__()`, by copying the field values
+        of `data` that are also fields of `TModel`. This is several times faster, but mapper
+        `init` listeners are not called.
+
+        Arguments:
+            data: The model to be created.
+        """
+        if self._skip_validation_on_create:
+            return cast(TModel, _get_unvalidated_factory(self._model)(data))
+
+        return self._model.model_validate(data)
+
+    def _prepare_for_create_dict(self, data: TCreate) -> dict[str, Any]:
+        """
+        Hook that is called before bulk inserting a model.
+
+        The method's role is to convert the given data into a `dict` of attribute name - value
+        pairs that can be inserted into the table of `TModel`.
+
+        The default implementation converts the data with `_prepare_for_create()` and reads the
+        values of the column attributes of the result. Like the ORM, it omits the `None` values
+        of primary key attributes and of attributes whose column has a default, to let the database
+        generate them. The values are not serialized, so excluded fields, field serializers, and
+        computed fields of `TModel` don't affect the result.
+
+        Arguments:
+            data: The model to be created.
+        """
+        defaulted_keys = self._defaulted_keys
+        item = self._prepare_for_create(data)
+        return {
+            key: value
+            for key in self._column_keys
+            if (value := getattr(item, key)) is not None or key not in defaulted_keys
+        }
+
+    def _prepare_for_update(self, data: TUpdate) -> dict[str, Any]:
+        """
+        Hook that is called before applying the given update.
+
+        The method's role is to convert the given data into a `dict` of
+        attribute name - new value pairs, omitting unchanged values.
+
+        The default implementation is equivalent to `data.model_dump(exclude_unset=True)`.
+        If the configuration of `TUpdate` allows it, the set fields are read directly
+        from the instance instead of going through the serializer.
+
+        Arguments:
+            data: The update data.
+        """
+        dump = _get_update_dumper(type(data))
+        return data.model_dump(exclude_unset=True) if dump is None else dump(data)
+
+    def _set_changes(self, item: TModel, changes: dict[str, Any]) -> TModel:
+        """
+        Sets the given changes on the given item.
+
+        Arguments:
+            item: The item to update.
+            changes: The attribute name - new value pairs to set.
+
+        Returns:
+            The received item.
+        """
+        # The changes must go through the instrumented attributes, otherwise they are not tracked
+        # and not flushed. Benchmarks showed sqlmodel_update() to be slower than this loop.
+        for key, value in changes.items():
+            setattr(item, key, value)
+
+        return item
+
+    def _set_committed_changes(self, changes: Sequence[tuple[TModel, dict[str, Any]]], *, matched: int) -> None:
+        """
+        Sets the given changes on the corresponding items as their committed state,
+        so the ORM doesn't flush them again.
+
+        Arguments:
+            changes: The items and the changes that were written to the database.
+            matched: The number of rows the update statement matched.
+
+        Raises:
+            StaleDataError: If the update statement didn't match exactly one row for each item.
+        """
+        if matched != len(changes):
+            table = class_mapper(self._model).local_table
+            raise StaleDataError(
+                f"UPDATE statement on table '{table}' expected to update {len(changes)} row(s); "
+                f"{matched} were matched."
+            )
+
+        for item, item_changes in changes:
+            for key, value in item_changes.items():
+                set_committed_value(item, key, value)
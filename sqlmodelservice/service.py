@@ -1,33 +1,25 @@
-from collections.abc import Iterable, Mapping, Sequence
-from typing import Any, Generic, Literal, Type, TypeVar, cast, overload
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import chain
+from typing import Any, Literal, Type, TypeVar, cast, overload
 
+from sqlalchemy import delete, insert, update
 from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import CursorResult, Dialect, RowMapping
 from sqlalchemy.engine.result import ScalarResult, TupleResult
 from sqlalchemy.sql.elements import ColumnElement
-from sqlmodel import Session, SQLModel, select
+from sqlmodel import Session, select
 from sqlmodel.sql.expression import Select, SelectOfScalar
 
-from .errors import MultipleResultsFound, NotFound, ServiceException
+from .base import AtomicPrimaryKey as AtomicPrimaryKey
+from .base import PrimaryKey as PrimaryKey
+from .base import ServiceBase, TCreate, TModel, TPrimaryKey, TUpdate, chunks
+from .errors import CommitFailed, MultipleResultsFound, NotFound, ServiceException
 from .utils import safe_commit
 
-AtomicPrimaryKey = int | str
-PrimaryKey = AtomicPrimaryKey | tuple[AtomicPrimaryKey, ...] | list[AtomicPrimaryKey] | Mapping[str, AtomicPrimaryKey]
-
 T = TypeVar("T")
-TM_1 = TypeVar("TM_1", bound=SQLModel)
-TM_2 = TypeVar("TM_2", bound=SQLModel)
-TM_3 = TypeVar("TM_3", bound=SQLModel)
-TM_4 = TypeVar("TM_4", bound=SQLModel)
-TM_5 = TypeVar("TM_5", bound=SQLModel)
-TM_6 = TypeVar("TM_6", bound=SQLModel)
-
-TModel = TypeVar("TModel", bound=SQLModel)
-TCreate = TypeVar("TCreate", bound=SQLModel)
-TUpdate = TypeVar("TUpdate", bound=SQLModel)
-TPrimaryKey = TypeVar("TPrimaryKey", bound=PrimaryKey)
 
 
-class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
+class Service(ServiceBase[TModel, TCreate, TUpdate, TPrimaryKey]):
     """
     Base service implementation.
 
@@ -45,12 +37,14 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
       `_prepare_for_update()`, which you may override.
     - `TPrimaryKey`: The type definition of the primary key of `TModel`. Often simply `int` or
       `str`, or `tuple` for complex keys.
+
+    Class attributes:
+    - `_skip_validation_on_create`: If `True`, `_prepare_for_create()` creates `TModel` instances
+      without validation, by copying the field values of `TCreate`. Only enable it if `TCreate`
+      is validated and its fields are compatible with `TModel`.
     """
 
-    __slots__ = (
-        "_model",
-        "_session",
-    )
+    __slots__ = ("_session",)
 
     def __init__(self, session: Session, *, model: Type[TModel]) -> None:
         """
@@ -62,18 +56,42 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
                 service from then on.
             model: The database *table* model.
         """
-        self._model = model
         self._session = session
+        super().__init__(model=model)
 
     @overload
     def add_to_session(
-        self, items: Iterable[TCreate], *, commit: bool = False, operation: Literal["create"]
+        self,
+        items: Iterable[TCreate],
+        *,
+        commit: bool = False,
+        operation: Literal["create"],
+        bulk: bool = False,
+        chunk_size: int = 1000,
     ) -> list[TModel]:
         ...
 
     @overload
     def add_to_session(
-        self, items: Iterable[tuple[TModel, TUpdate]], *, commit: bool = False, operation: Literal["update"]
+        self,
+        items: Iterable[tuple[TModel, TUpdate]],
+        *,
+        commit: bool = False,
+        operation: Literal["update"],
+        bulk: bool = False,
+        chunk_size: int = 1000,
+    ) -> list[TModel]:
+        ...
+
+    @overload
+    def add_to_session(
+        self,
+        items: Iterable[TCreate],
+        *,
+        commit: bool = False,
+        operation: Literal["upsert"],
+        bulk: bool = False,
+        chunk_size: int = 1000,
     ) -> list[TModel]:
         ...
 
@@ -82,7 +100,9 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
         items: Iterable[TCreate] | Iterable[tuple[TModel, TUpdate]],
         *,
         commit: bool = False,
-        operation: Literal["create", "update"],
+        operation: Literal["create", "update", "upsert"],
+        bulk: bool = False,
+        chunk_size: int = 1000,
     ) -> list[TModel]:
         """
         Adds all items to the session using the same flow as `create()` or `update()`,
@@ -95,29 +115,77 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
         Note: even if `commit` is `True`, the method *will not perform a refresh* on the items
         as it has to be done one by one which would be very inefficient with many items.
 
+        If `bulk` is `True`, the database driver supports multi-row `INSERT ... RETURNING` statements,
+        and `_can_insert_directly()` is `True`, then `create` operations are executed immediately
+        with a single bulk `INSERT` statement instead of the ORM's unit of work. In this case the items
+        are converted to column values by `_prepare_for_create_dict()`. Otherwise, for example if
+        `TModel` has relationships or insert listeners, the method falls back to the default behavior.
+
+        If `bulk` is `True`, the model has a single-column primary key, and `_can_update_directly()`
+        is `True`, then `update` operations are executed immediately: items that change the same set
+        of attributes are updated with a single `UPDATE ... SET column = CASE ... END` statement.
+        Groups with less than 3 items and items that occur more than once go through the default flow.
+
+        `upsert` operations are always executed immediately with a single bulk
+        `INSERT ... ON CONFLICT (<primary key>) DO UPDATE ... RETURNING` statement per chunk.
+        Items are converted to column values by `_prepare_for_create_dict()`, and the non-primary
+        key columns of existing rows are overwritten. Upserts are supported on PostgreSQL and SQLite.
+
+        Items are processed in chunks of `chunk_size` items. Every full chunk is flushed to the
+        database before the next one is processed, which keeps the ORM's flush buffer bounded.
+        The changes are still committed at once (if `commit` is `True`). On PostgreSQL, chunks
+        larger than about 1000 items rarely improve throughput, while MySQL often benefits from
+        somewhat larger chunks.
+
         Arguments:
             items: The items to add to the session.
             commit: Whether to also commit the changes to the database.
             operation: The desired operation.
+            bulk: Whether to use bulk statements for the operation if possible.
+            chunk_size: The maximum number of items to process before flushing the session.
 
         Returns:
             The list of items that were added to the session.
 
         Raises:
             CommitFailed: If the service fails to commit the operation.
+            ValueError: If `chunk_size` is not positive.
         """
+        session = self._session
+        db_items: list[TModel] = []
         if operation == "create":
             items = cast(Iterable[TCreate], items)
-            db_items = [self._prepare_for_create(item) for item in items]
+            use_bulk_insert = (
+                bulk and self._get_dialect().insert_executemany_returning and self._can_insert_directly()
+            )
+            prepare_for_create = self._prepare_for_create
+            for chunk in chunks(items, chunk_size):
+                if use_bulk_insert:
+                    db_items.extend(self._insert_all(chunk))
+                    continue
+
+                chunk_items = [prepare_for_create(item) for item in chunk]
+                db_items.extend(self._add_all(chunk_items, chunk_size=chunk_size))
         elif operation == "update":
             items = cast(Iterable[tuple[TModel, TUpdate]], items)
-            db_items = [self._apply_changes_to_item(item, changes) for item, changes in items]
+            use_bulk_update = bulk and len(self._pk_cols) == 1 and self._can_update_directly()
+            apply_changes_to_item = self._apply_changes_to_item
+            for update_chunk in chunks(items, chunk_size):
+                if use_bulk_update:
+                    db_items.extend(self._update_all(update_chunk))
+                    continue
+
+                chunk_items = [apply_changes_to_item(item, changes) for item, changes in update_chunk]
+                db_items.extend(self._add_all(chunk_items, chunk_size=chunk_size))
+        elif operation == "upsert":
+            items = cast(Iterable[TCreate], items)
+            for chunk in chunks(items, chunk_size):
+                db_items.extend(self._upsert_all(chunk))
         else:
             raise ServiceException(f"Unsupported operation: {operation}")
 
-        self._session.add_all(db_items)
         if commit:
-            self._safe_commit("Commit failed.")
+            safe_commit(session, error_msg="Commit failed.")
 
         return db_items
 
@@ -128,31 +196,52 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
         order_by: Sequence[ColumnElement[Any]] | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        unique: bool = False,
     ) -> Sequence[TModel]:
         """
         Returns all items that match the given where clause.
 
+        Set `unique` to `True` if `_loader_options()` eagerly loads collections with
+        `joinedload()`. Joined eager loading returns the same item once for every related row,
+        and these duplicates are only removed if `unique` is set. Uniquing happens in Python,
+        by hashing every returned item, so it's disabled by default.
+
         Arguments:
             where: An optional where clause for the query.
             order_by: An optional sequence of order by clauses.
             limit: An optional limit for the number of items to return.
             offset: The number of items to skip.
+            unique: Whether to remove duplicate items from the result.
         """
-        stmt = self.select()
+        stmt = self._apply_clauses(self.select(), where, order_by=order_by, limit=limit, offset=offset)
+        result = self._session.exec(stmt)
+        return result.unique().all() if unique else result.all()
 
-        if where is not None:
-            stmt = stmt.where(where)
-
-        if order_by is not None:
-            stmt = stmt.order_by(*order_by)
-
-        if limit is not None:
-            stmt = stmt.limit(limit)
+    def all_as_dicts(
+        self,
+        where: ColumnElement[bool] | bool | None = None,
+        *,
+        order_by: Sequence[ColumnElement[Any]] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+    ) -> Sequence[RowMapping]:
+        """
+        Returns the column values of all items that match the given where clause.
 
-        if offset is not None:
-            stmt = stmt.offset(offset)
+        It's a read-only projection of `all()`: it selects the table's columns directly, so no
+        ORM instances are created and the session's identity map is not touched. The returned
+        mappings are keyed by the attribute names of `TModel`.
 
-        return self.exec(stmt).all()
+        Arguments:
+            where: An optional where clause for the query.
+            order_by: An optional sequence of order by clauses.
+            limit: An optional limit for the number of items to return.
+            offset: The number of items to skip.
+        """
+        stmt = self._apply_clauses(
+            self._create_columns_select(), where, order_by=order_by, limit=limit, offset=offset
+        )
+        return self._session.execute(stmt).mappings().all()
 
     def create(self, data: TCreate) -> TModel:
         """
@@ -167,7 +256,7 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
         session = self._session
         db_item = self._prepare_for_create(data)
         session.add(db_item)
-        self._safe_commit("Commit failed.")
+        safe_commit(session, error_msg="Commit failed.")
         session.refresh(db_item)
         return db_item
 
@@ -175,6 +264,11 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
         """
         Deletes the item with the given primary key from the database.
 
+        If `TModel` has no relationships, version counter, or `before_delete` / `after_delete`
+        listeners, then the item is deleted with a single `DELETE` statement, without loading it
+        first, and it is expunged from the session if it's loaded. Otherwise the item is loaded
+        and deleted using the ORM's unit of work, which applies ORM-level cascades.
+
         Arguments:
             pk: The primary key.
 
@@ -183,13 +277,31 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
             NotFound: If the document with the given primary key does not exist.
         """
         session = self._session
+        if not self._can_delete_directly():
+            item = self.get_by_pk(pk)
+            if item is None:
+                raise NotFound(self._format_primary_key(pk))
+
+            session.delete(item)
+            safe_commit(session, error_msg="Failed to delete item.")
+            return
+
+        stmt = delete(self._model).where(self._pk_clause(pk))
+        # Session synchronization is skipped, because it scans the entire identity map.
+        # The deleted item can only be there under its identity key, so it's looked up directly.
+        try:
+            result = cast(CursorResult[Any], session.execute(stmt, execution_options={"synchronize_session": False}))
+        except Exception as e:
+            session.rollback()
+            raise CommitFailed("Failed to delete item.") from e
 
-        item = self.get_by_pk(pk)
-        if item is None:
+        if result.rowcount == 0:
             raise NotFound(self._format_primary_key(pk))
 
-        session.delete(item)
-        self._safe_commit("Failed to delete item.")
+        if (item := session.identity_map.get(self._identity_key(pk))) is not None:
+            session.expunge(item)
+
+        safe_commit(session, error_msg="Failed to delete item.")
 
     @overload
     def exec(self, statement: Select[T]) -> TupleResult[T]:
@@ -213,14 +325,49 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
         """
         return self._session.exec(select(self._model)).all()
 
-    def get_by_pk(self, pk: PrimaryKey) -> TModel | None:
+    def get_by_pk(self, pk: PrimaryKey, *, fresh: bool = False) -> TModel | None:
         """
         Returns the item with the given primary key if it exists.
 
+        If the item is already loaded in the session and `fresh` is `False`, then it is returned
+        from the session's identity map without querying the database. If `fresh` is `True`,
+        the item is always loaded from the database, overwriting its state in the session.
+
+        The loader options returned by `_loader_options()` are applied to the query.
+
         Arguments:
             pk: The primary key.
+            fresh: Whether to load the item from the database even if it's already in the session.
         """
-        return self._session.get(self._model, pk)
+        return self._session.get(self._model, pk, options=self._loader_options(), populate_existing=fresh)
+
+    def iter_all(
+        self,
+        where: ColumnElement[bool] | bool | None = None,
+        *,
+        order_by: Sequence[ColumnElement[Any]] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[TModel]:
+        """
+        Returns an iterator over all items that match the given where clause.
+
+        Unlike `all()`, the method doesn't load the entire result set into memory, it fetches
+        the items from the database in chunks of `chunk_size` items. If the driver supports
+        server-side cursors (like `psycopg2`), they will be used to stream the results.
+
+        The session must not be used for other queries until the iteration is complete.
+
+        Arguments:
+            where: An optional where clause for the query.
+            order_by: An optional sequence of order by clauses.
+            limit: An optional limit for the number of items to return.
+            offset: The number of items to skip.
+            chunk_size: The number of items to fetch from the database at once.
+        """
+        stmt = self._apply_clauses(self.select(), where, order_by=order_by, limit=limit, offset=offset)
+        return chain.from_iterable(self._session.exec(stmt.execution_options(yield_per=chunk_size)).partitions())
 
     def one(
         self,
@@ -237,7 +384,7 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
             NotFound: If no items match the where clause.
         """
         try:
-            return self.exec(self.select().where(where)).one()
+            return self._session.exec(self.select().where(where)).one()
         except sa_exc.MultipleResultsFound as e:
             raise MultipleResultsFound("Multiple items matched the where clause.") from e
         except sa_exc.NoResultFound as e:
@@ -257,7 +404,7 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
             MultipleResultsFound: If multiple items match the where clause.
         """
         try:
-            return self.exec(self.select().where(where)).one_or_none()
+            return self._session.exec(self.select().where(where)).one_or_none()
         except sa_exc.MultipleResultsFound as e:
             raise MultipleResultsFound("Multiple items matched the where clause.") from e
 
@@ -267,100 +414,16 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
         """
         self._session.refresh(instance)
 
-    @overload
-    def select(self) -> SelectOfScalar[TModel]:
-        ...
-
-    @overload
-    def select(self, joined_1: Type[TM_1], /) -> SelectOfScalar[tuple[TModel, TM_1]]:
-        ...
-
-    @overload
-    def select(self, joined_1: Type[TM_1], joined_2: Type[TM_2], /) -> SelectOfScalar[tuple[TModel, TM_1, TM_2]]:
-        ...
-
-    @overload
-    def select(
-        self, joined_1: Type[TM_1], joined_2: Type[TM_2], joined_3: Type[TM_3], /
-    ) -> SelectOfScalar[tuple[TModel, TM_1, TM_2, TM_3]]:
-        ...
-
-    @overload
-    def select(
-        self,
-        joined_1: Type[TM_1],
-        joined_2: Type[TM_2],
-        joined_3: Type[TM_3],
-        joined_4: Type[TM_4],
-        /,
-    ) -> SelectOfScalar[tuple[TModel, TM_1, TM_2, TM_3, TM_4]]:
-        ...
-
-    @overload
-    def select(
-        self,
-        joined_1: Type[TM_1],
-        joined_2: Type[TM_2],
-        joined_3: Type[TM_3],
-        joined_4: Type[TM_4],
-        joined_5: Type[TM_5],
-        /,
-    ) -> SelectOfScalar[tuple[TModel, TM_1, TM_2, TM_3, TM_4, TM_5]]:
-        ...
-
-    @overload
-    def select(
-        self,
-        joined_1: Type[TM_1],
-        joined_2: Type[TM_2],
-        joined_3: Type[TM_3],
-        joined_4: Type[TM_4],
-        joined_5: Type[TM_5],
-        joined_6: Type[TM_6],
-        /,
-    ) -> SelectOfScalar[tuple[TModel, TM_1, TM_2, TM_3, TM_4, TM_5, TM_6]]:
-        ...
-
-    def select(self, *joined: SQLModel) -> SelectOfScalar[SQLModel]:  # type: ignore[misc]
-        """
-        Creates a select statement on the service's table.
-
-        Positional arguments (SQLModel table definitions) will be included in the select statement.
-        You must specify the join condition for each included positional argument though.
-
-        If `joined` is not empty, then a tuple will be returned with `len(joined) + 1` values
-        in it. The first value will be an instance of `TModel`, the rest of the values will
-        correspond to the positional arguments that were passed to the method.
-
-        Example:
-
-        ```python
-        class A(SQLModel, table=True):
-            id: int | None = Field(primary_key=True)
-            a: str
-
-        class B(SQLModel, table=True):
-            id: int | None = Field(primary_key=True)
-            b: str
-
-        class AService(Service[A, A, A, int]):
-            def __init__(self, session: Session) -> None:
-                super().__init__(session, model=A)
-
-        with Session(engine) as session:
-            a_svc = AService(session)
-            q = a_svc.select(B).where(A.a == B.b)
-            result = svc.exec(q).one()
-            print(result[0])  # A instance
-            print(result[1])  # B instance
-        ```
-        """
-        return select(self._model, *joined)
-
     def update(self, pk: TPrimaryKey, data: TUpdate) -> TModel:
         """
         Updates the item with the given primary key.
 
+        If the database supports `UPDATE ... RETURNING` statements, then the item is updated
+        and loaded with a single statement, without fetching it first. The method falls back
+        to `get_by_pk()` and `update_item()` if the database doesn't support it, if `update_item()`
+        or `_apply_changes_to_item()` is overridden, or if `TModel` has a version counter or
+        `before_update` / `after_update` listeners.
+
         Arguments:
             pk: The primary key.
             data: Update data.
@@ -369,11 +432,34 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
             CommitFailed: If the service fails to commit the operation.
             NotFound: If the record with the given primary key does not exist.
         """
-        item = self.get_by_pk(pk)
-        if item is None:
+        if (
+            type(self).update_item is not Service.update_item
+            or not self._can_update_directly()
+            or not self._get_dialect().update_returning
+            or len(changes := self._prepare_for_update(data)) == 0
+        ):
+            item = self.get_by_pk(pk)
+            if item is None:
+                raise NotFound(self._format_primary_key(pk))
+
+            return self.update_item(item, data)
+
+        session = self._session
+        stmt = update(self._model).where(self._pk_clause(pk)).values(changes).returning(self._model)
+        try:
+            db_item = session.scalars(stmt).one_or_none()
+        except Exception as e:
+            session.rollback()
+            raise CommitFailed("Update failed.") from e
+
+        if db_item is None:
             raise NotFound(self._format_primary_key(pk))
 
-        return self.update_item(item, data)
+        safe_commit(session, error_msg="Update failed.")
+        if session.expire_on_commit:
+            session.refresh(db_item)
+
+        return db_item
 
     def update_item(self, item: TModel, data: TUpdate) -> TModel:
         """
@@ -392,80 +478,95 @@ class Service(Generic[TModel, TCreate, TUpdate, TPrimaryKey]):
         session = self._session
         self._apply_changes_to_item(item, data)
         session.add(item)
-        self._safe_commit("Update failed.")
+        safe_commit(session, error_msg="Update failed.")
 
         session.refresh(item)
         return item
 
-    def _apply_changes_to_item(self, item: TModel, data: TUpdate) -> TModel:
+    def _add_all(self, items: list[TModel], *, chunk_size: int) -> list[TModel]:
         """
-        Applies the given changes to the given item without committing anything.
+        Adds the given chunk of items to the session, and flushes the session if the chunk is full.
 
         Arguments:
-            item: The item to update.
-            data: The changes to make to `item`.
+            items: The items to add to the session.
+            chunk_size: The chunk size that was used to create the chunk.
 
         Returns:
-            The received item.
+            The received items.
         """
-        changes = self._prepare_for_update(data)
-        for key, value in changes.items():
-            setattr(item, key, value)
+        self._session.add_all(items)
+        if len(items) == chunk_size:
+            self._session.flush()
 
-        return item
+        return items
 
-    def _format_primary_key(self, pk: TPrimaryKey) -> str:
+    def _get_dialect(self) -> Dialect:
         """
-        Returns the string-formatted version of the primary key.
-
-        Arguments:
-            pk: The primary key to format.
-
-        Raises:
-            ValueError: If formatting fails.
+        Returns the dialect of the database the service's session is bound to.
         """
-        if isinstance(pk, (str, int)):
-            return str(pk)
-        elif isinstance(pk, (tuple, list)):
-            return "|".join(str(i) for i in pk)
-        elif isinstance(pk, dict):
-            return "|".join(f"{k}:{v}" for k, v in pk.items())
+        return self._session.get_bind(self._model).dialect
 
-        raise ValueError("Unrecognized primary key type.")
-
-    def _prepare_for_create(self, data: TCreate) -> TModel:
+    def _insert_all(self, items: Iterable[TCreate]) -> list[TModel]:
         """
-        Hook that is called before applying creating a model.
+        Inserts all the given items using a single bulk `INSERT ... RETURNING` statement.
 
-        The methods role is to convert certain attributes of the given model's before creating it.
+        The method requires driver support for multi-row `INSERT ... RETURNING` statements.
 
         Arguments:
-            data: The model to be created.
-        """
-        return self._model.model_validate(data)
+            items: The items to insert.
 
-    def _prepare_for_update(self, data: TUpdate) -> dict[str, Any]:
+        Returns:
+            The inserted items.
         """
-        Hook that is called before applying the given update.
+        prepare_for_create_dict = self._prepare_for_create_dict
+        values = [prepare_for_create_dict(item) for item in items]
+        if len(values) == 0:
+            return []
 
-        The method's role is to convert the given data into a `dict` of
-        attribute name - new value pairs, omitting unchanged values.
+        stmt = insert(self._model).returning(self._model, sort_by_parameter_order=True)
+        return list(self._session.scalars(stmt, values))
 
-        The default implementation is `data.model_dump(exclude_unset=True)`.
+    def _update_all(self, items: Sequence[tuple[TModel, TUpdate]]) -> list[TModel]:
+        """
+        Updates the given items as described in `_plan_bulk_update()`.
 
         Arguments:
-            data: The update data.
+            items: The items to update, with the corresponding update data.
+
+        Returns:
+            The received items.
+
+        Raises:
+            StaleDataError: If an update statement didn't match the row of every item it updates.
         """
-        return data.model_dump(exclude_unset=True)
+        session = self._session
+        orm_items, statements = self._plan_bulk_update(items, session=session)
+        session.add_all(orm_items)
+        for stmt, changes in statements:
+            result = cast(CursorResult[Any], session.execute(stmt, execution_options={"synchronize_session": False}))
+            self._set_committed_changes(changes, matched=result.rowcount)
+
+        return [item for item, _ in items]
 
-    def _safe_commit(self, error_msg: str) -> None:
+    def _upsert_all(self, items: Iterable[TCreate]) -> list[TModel]:
         """
-        Commits the session, making sure it is rolled back in case the commit fails.
+        Inserts or updates all the given items using a single bulk
+        `INSERT ... ON CONFLICT DO UPDATE ... RETURNING` statement.
 
         Arguments:
-            error_msg: The message for the raised exception.
+            items: The items to upsert.
+
+        Returns:
+            The inserted or updated items.
 
         Raises:
-            CommitFailed: If committing the session failed.
+            ServiceException: If the database dialect doesn't support upserts.
         """
-        safe_commit(self._session, error_msg=error_msg)
+        prepare_for_create_dict = self._prepare_for_create_dict
+        values = [prepare_for_create_dict(item) for item in items]
+        if len(values) == 0:
+            return []
+
+        stmt = self._create_upsert(self._get_dialect())
+        # Items that are already in the session must be updated with the returned values.
+        return list(self._session.scalars(stmt, values, execution_options={"populate_existing": True}))
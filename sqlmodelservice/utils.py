@@ -4,6 +4,7 @@ from .errors import CommitFailed
 
 if TYPE_CHECKING:
     from sqlmodel import Session
+    from sqlmodel.ext.asyncio.session import AsyncSession
 
 
 def safe_commit(session: "Session", *, error_msg: str) -> None:
@@ -21,3 +22,20 @@ def safe_commit(session: "Session", *, error_msg: str) -> None:
     except Exception as e:
         session.rollback()
         raise CommitFailed(error_msg) from e
+
+
+async def async_safe_commit(session: "AsyncSession", *, error_msg: str) -> None:
+    """
+    Commits the async session, making sure it is rolled back in case the commit fails.
+
+    Arguments:
+        error_msg: The message for the raised exception.
+
+    Raises:
+        CommitFailed: If committing the session failed.
+    """
+    try:
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        raise CommitFailed(error_msg) from e
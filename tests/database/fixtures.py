@@ -1,9 +1,11 @@
 from collections.abc import Generator
+from contextlib import ExitStack
 
 import pytest
 from pytest_docker.plugin import Services as DockerServices
-from sqlalchemy import Engine
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy import Engine, NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, delete, insert, select
 
 
 @pytest.fixture(scope="session")
@@ -11,9 +13,31 @@ def db_connect_string(*, docker_ip: str, docker_services: DockerServices) -> str
     return f"postgresql://postgres:postgres@{docker_ip}:{docker_services.port_for('db', 5432)}"
 
 
+@pytest.fixture(scope="session")
+def async_db_connect_string(*, db_connect_string: str) -> str:
+    return db_connect_string.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+_pool_size = 5
+"""The number of connections the engine keeps open."""
+
+
 @pytest.fixture(scope="session")
 def engine(*, db_connect_string: str) -> Engine:
-    return create_engine(db_connect_string)
+    return create_engine(
+        db_connect_string,
+        pool_size=_pool_size,
+        max_overflow=5,
+        pool_pre_ping=True,
+        # Reuse the most recently returned connection, so idle pre-warmed connections stay idle.
+        pool_use_lifo=True,
+    )
+
+
+@pytest.fixture(scope="session")
+def async_engine(*, async_db_connect_string: str, database: Engine) -> AsyncEngine:
+    # Every async test runs in its own event loop, so connections must not be pooled across tests.
+    return create_async_engine(async_db_connect_string, poolclass=NullPool)
 
 
 def _init_db(engine: Engine) -> None:
@@ -26,12 +50,30 @@ def _init_db(engine: Engine) -> None:
 
 def _ping_database(engine: Engine) -> bool:
     try:
-        engine.connect()
-        return True
+        with engine.connect():
+            return True
     except Exception:
         return False
 
 
+def _warm_up_pool(engine: Engine) -> None:
+    # Connections are held open at the same time, otherwise the pool would reuse the same one.
+    with ExitStack() as stack:
+        for _ in range(_pool_size):
+            stack.enter_context(engine.connect())
+
+
+def _warm_up_statement_cache(engine: Engine) -> None:
+    from .player import DbPlayer
+
+    # Compile the most common statements before the first test, then discard the changes.
+    with Session(engine) as session:
+        session.execute(select(DbPlayer))
+        session.execute(insert(DbPlayer), [{"name": "warm-up"}])
+        session.execute(delete(DbPlayer))
+        session.rollback()
+
+
 @pytest.fixture(scope="session")
 def database(*, engine: Engine, docker_services: DockerServices) -> Engine:
     docker_services.wait_until_responsive(
@@ -41,11 +83,14 @@ def database(*, engine: Engine, docker_services: DockerServices) -> Engine:
     )
 
     _init_db(engine)
+    _warm_up_pool(engine)
+    _warm_up_statement_cache(engine)
 
     return engine
 
 
-@pytest.fixture(scope="function")
-def session(*, database: Engine) -> Generator[Session, None, None]:
-    with Session(database) as session:
+@pytest.fixture(scope="session")
+def query_session(*, engine: Engine) -> Generator[Session, None, None]:
+    """Secondary session only for querying data."""
+    with Session(engine) as session:
         yield session
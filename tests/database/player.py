@@ -1,12 +1,15 @@
 from collections.abc import Sequence
 
+from sqlalchemy.orm import defer
+from sqlalchemy.orm.interfaces import ORMOption
 from sqlmodel import Field, Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from sqlmodelservice import Service
+from sqlmodelservice import AsyncService, Service
 
 
 class PlayerBase(SQLModel):
-    name: str
+    name: str = Field(index=True)
 
 
 class DbPlayer(PlayerBase, table=True):
@@ -19,6 +22,10 @@ class PlayerCreate(PlayerBase):
     ...
 
 
+class PlayerImport(PlayerBase):
+    id: int | None = None
+
+
 class PlayerRead(PlayerBase):
     id: int
 
@@ -35,3 +42,56 @@ class PlayerService(Service[DbPlayer, PlayerCreate, PlayerUpdate, int]):
 
     def get_by_name(self, name: str) -> Sequence[DbPlayer]:
         return self.exec(self.select().where(DbPlayer.name == name)).all()
+
+
+class PlayerImportService(Service[DbPlayer, PlayerImport, PlayerUpdate, int]):
+    __slots__ = ()
+
+    def __init__(self, session: Session) -> None:
+        super().__init__(session, model=DbPlayer)
+
+
+class AsyncPlayerService(AsyncService[DbPlayer, PlayerCreate, PlayerUpdate, int]):
+    __slots__ = ()
+
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, model=DbPlayer)
+
+
+class AsyncPlayerImportService(AsyncService[DbPlayer, PlayerImport, PlayerUpdate, int]):
+    __slots__ = ()
+
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session, model=DbPlayer)
+
+
+class UppercasePlayerService(PlayerService):
+    """Player service that stores the names of updated players in upper case."""
+
+    __slots__ = ()
+
+    def _apply_changes_to_item(self, item: DbPlayer, data: PlayerUpdate) -> DbPlayer:
+        item = super()._apply_changes_to_item(item, data)
+        item.name = item.name.upper()
+        return item
+
+
+class UnvalidatedPlayerService(PlayerService):
+    """Player service that creates players without validation."""
+
+    __slots__ = ()
+
+    _skip_validation_on_create = True
+
+
+class DeferredNamePlayerService(PlayerService):
+    """Player service that only loads the names of players when they are accessed."""
+
+    __slots__ = ("_options",)
+
+    def __init__(self, session: Session) -> None:
+        super().__init__(session)
+        self._options = (defer(DbPlayer.name),)  # type: ignore[arg-type] # It's an instrumented attribute.
+
+    def _loader_options(self) -> Sequence[ORMOption]:
+        return self._options
@@ -0,0 +1,21 @@
+from sqlmodel import col, func, select
+
+from .player import DbPlayer
+
+players_by_id = select(DbPlayer).order_by(col(DbPlayer.id))
+"""Select statement that returns all players, ordered by ID."""
+
+player_rows = select(col(DbPlayer.id), col(DbPlayer.name))
+"""Select statement that returns the ID and name of all players."""
+
+player_count = select(func.count()).select_from(DbPlayer)
+"""Select statement that returns the number of players."""
+
+name_is_first = col(DbPlayer.name) == "First"
+"""Where clause that matches the player named "First"."""
+
+name_is_missing = col(DbPlayer.name) == "Does Not Exist"
+"""Where clause that doesn't match any player."""
+
+name_desc = (col(DbPlayer.name).desc(),)
+"""Order by clauses for descending order by name."""
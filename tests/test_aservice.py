@@ -0,0 +1,182 @@
+from collections.abc import AsyncGenerator, Generator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from sqlmodelservice import CommitFailed, MultipleResultsFound, NotFound
+
+from .database.player import (
+    AsyncPlayerImportService,
+    AsyncPlayerService,
+    DbPlayer,
+    PlayerCreate,
+    PlayerImport,
+    PlayerUpdate,
+)
+from .database.queries import name_desc, name_is_first, name_is_missing, player_count, players_by_id
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def service(database: Engine, async_engine: AsyncEngine) -> AsyncGenerator[AsyncPlayerService, None]:
+    """Service with its own session, removes every player after the test."""
+    # Lazy loading is not available with async sessions, items must not be expired on commit.
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield AsyncPlayerService(session)
+
+    with Session(database) as cleanup_session:
+        cleanup_session.execute(delete(DbPlayer))
+        cleanup_session.commit()
+
+
+@pytest.fixture
+def query_session(database: Engine) -> Generator[Session, None, None]:
+    """Sync session for checking the committed data."""
+    with Session(database) as session:
+        yield session
+
+
+def _names(session: Session) -> list[str]:
+    """Returns the names of the stored players, ordered by ID."""
+    session.expire_all()
+    return [p.name for p in session.exec(players_by_id).all()]
+
+
+async def test_create_update_delete(service: AsyncPlayerService, query_session: Session) -> None:
+    player = await service.create(PlayerCreate(name="First"))
+    assert player.id is not None
+    assert _names(query_session) == ["First"]
+
+    updated = await service.update(player.id, PlayerUpdate(name="Updated"))
+    assert updated.id == player.id
+    assert updated.name == "Updated"
+    assert _names(query_session) == ["Updated"]
+
+    with pytest.raises(NotFound):
+        await service.update(-1, PlayerUpdate(name="Does Not Exist"))
+
+    await service.delete_by_pk(player.id)
+    with pytest.raises(NotFound):
+        await service.delete_by_pk(player.id)
+
+    assert await service.get_by_pk(player.id) is None
+    assert _names(query_session) == []
+
+
+async def test_create_conflict(service: AsyncPlayerService, query_session: Session) -> None:
+    player = await service.create(PlayerCreate(name="First"))
+    # The conflict must come from the database, not from the session's identity map.
+    service._session.expunge(player)
+    import_service = AsyncPlayerImportService(service._session)
+
+    with pytest.raises(CommitFailed):
+        await import_service.create(PlayerImport(id=player.id, name="Duplicate"))
+
+    # The session is rolled back, so it can be used again.
+    await service.create(PlayerCreate(name="Second"))
+    assert _names(query_session) == ["First", "Second"]
+
+
+async def test_add_to_session_create(service: AsyncPlayerService, query_session: Session) -> None:
+    players = await service.add_to_session(
+        (PlayerCreate(name=f"Player {i}") for i in range(5)),
+        operation="create",
+        chunk_size=2,
+    )
+    assert len(players) == 5
+    assert _names(query_session) == []
+
+    players = await service.add_to_session(
+        (PlayerCreate(name="First"), PlayerCreate(name="Second")),
+        operation="create",
+        commit=True,
+        bulk=True,
+    )
+    assert [p.name for p in players] == ["First", "Second"]
+    assert all(p.id is not None for p in players)
+    assert query_session.exec(player_count).one() == 7
+
+
+async def test_add_to_session_update(service: AsyncPlayerService, query_session: Session) -> None:
+    await service.add_to_session(
+        (PlayerCreate(name="First"), PlayerCreate(name="Second"), PlayerCreate(name="Third")),
+        operation="create",
+        commit=True,
+    )
+
+    players = await service.add_to_session(
+        (
+            (p, PlayerUpdate(name=f"{p.name} - {i}"))
+            for i, p in enumerate((await service.exec(players_by_id)).all(), 1)
+        ),
+        operation="update",
+        commit=True,
+        bulk=True,
+    )
+    assert [p.name for p in players] == ["First - 1", "Second - 2", "Third - 3"]
+    assert _names(query_session) == ["First - 1", "Second - 2", "Third - 3"]
+
+    await service.add_to_session(
+        ((p, PlayerUpdate(name=p.name.upper())) for p in players),
+        operation="update",
+        commit=True,
+    )
+    assert _names(query_session) == ["FIRST - 1", "SECOND - 2", "THIRD - 3"]
+
+
+async def test_upsert(service: AsyncPlayerService, query_session: Session) -> None:
+    first, second = await service.add_to_session(
+        (PlayerCreate(name="First"), PlayerCreate(name="Second")),
+        operation="create",
+        commit=True,
+    )
+    import_service = AsyncPlayerImportService(service._session)
+
+    players = await import_service.add_to_session(
+        (
+            PlayerImport(id=first.id, name="First - 1"),
+            PlayerImport(id=second.id, name="Second - 2"),
+            PlayerImport(name="Third"),
+        ),
+        operation="upsert",
+        commit=True,
+    )
+    assert [p.name for p in players] == ["First - 1", "Second - 2", "Third"]
+    assert players[0] is first
+    assert players[1] is second
+    assert players[2].id is not None
+    assert _names(query_session) == ["First - 1", "Second - 2", "Third"]
+
+
+async def test_queries(service: AsyncPlayerService, query_session: Session) -> None:
+    await service.add_to_session(
+        (PlayerCreate(name="First"), PlayerCreate(name="Second")),
+        operation="create",
+        commit=True,
+    )
+
+    result = await service.all(name_is_first)
+    assert [p.name for p in result] == ["First"]
+
+    result = await service.all(order_by=name_desc, unique=True)
+    assert [p.name for p in result] == ["Second", "First"]
+
+    assert [p.name async for p in service.iter_all(order_by=name_desc, chunk_size=1)] == ["Second", "First"]
+
+    assert (await service.one(name_is_first)).name == "First"
+    with pytest.raises(NotFound):
+        await service.one(name_is_missing)
+    with pytest.raises(MultipleResultsFound):
+        await service.one(True)
+
+    first = await service.one_or_none(name_is_first)
+    assert first is not None
+    assert first.name == "First"
+    assert await service.one_or_none(name_is_missing) is None
+    with pytest.raises(MultipleResultsFound):
+        await service.one_or_none(True)
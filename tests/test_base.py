@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+from pydantic import Field as PydanticField
+from pydantic import computed_field, field_serializer
+from sqlmodel import Field, SQLModel
+
+from sqlmodelservice.base import ServiceBase, _get_update_dumper
+
+from .database.player import DbPlayer, PlayerUpdate
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+class Nested(SQLModel):
+    value: int
+
+
+class Update(SQLModel):
+    name: str | None = None
+    score: int | None = None
+    point: Point | None = None
+    nested: Nested | None = None
+    tags: list[str] | None = None
+    meta: dict[str, Any] | None = None
+
+
+class ExtraUpdate(SQLModel):
+    model_config = {"extra": "allow"}
+
+    name: str | None = None
+
+
+class ExcludedUpdate(SQLModel):
+    name: str | None = None
+    secret: str | None = Field(default=None, exclude=True)
+
+
+class ExcludeIfUpdate(SQLModel):
+    name: str | None = None
+    secret: str | None = PydanticField(default=None, exclude_if=lambda value: value is None)
+
+
+class ComputedUpdate(SQLModel):
+    name: str | None = None
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def upper_name(self) -> str | None:
+        return None if self.name is None else self.name.upper()
+
+
+class SerializedUpdate(SQLModel):
+    name: str | None = None
+
+    @field_serializer("name")
+    def serialize_name(self, name: str | None) -> str | None:
+        return None if name is None else name.strip()
+
+
+class DbUser(SQLModel, table=True):
+    __tablename__ = "users"
+
+    id: int | None = Field(default=None, primary_key=True)
+    name: str
+    email: str = Field(exclude=True)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def upper_name(self) -> str:
+        return self.name.upper()
+
+
+def test_prepare_for_create_dict() -> None:
+    service = ServiceBase[DbUser, DbUser, DbUser, int](model=DbUser)
+    values = service._prepare_for_create_dict(DbUser(name="user", email="user@example.com"))
+    assert values == {"name": "user", "email": "user@example.com"}
+
+    values = service._prepare_for_create_dict(DbUser(id=1, name="user", email="user@example.com"))
+    assert values == {"id": 1, "name": "user", "email": "user@example.com"}
+
+
+@pytest.mark.parametrize(
+    "model", (DbPlayer, ExtraUpdate, ExcludedUpdate, ExcludeIfUpdate, ComputedUpdate, SerializedUpdate)
+)
+def test_update_dumper_not_available(model: type[SQLModel]) -> None:
+    assert _get_update_dumper(model) is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        PlayerUpdate(),
+        PlayerUpdate(name="Updated"),
+        Update(name="Updated", score=None),
+        Update(point=Point(x=1, y=2)),
+        Update(nested=Nested(value=1)),
+        Update(tags=["a", "b"], meta={"a": Nested(value=1)}),
+    ),
+)
+def test_update_dumper(data: SQLModel) -> None:
+    dump = _get_update_dumper(type(data))
+    assert dump is not None
+    assert dump(data) == data.model_dump(exclude_unset=True)
@@ -1,149 +1,430 @@
-from collections.abc import Generator
+from collections.abc import Generator, Iterable, Sequence
+from operator import attrgetter, itemgetter
 
 import pytest
 from sqlalchemy import Engine
-from sqlmodel import Session, col
+from sqlalchemy.orm.attributes import instance_state
+from sqlalchemy.orm.exc import StaleDataError
+from sqlmodel import Session, col, delete, insert
+
+from sqlmodelservice import CommitFailed, MultipleResultsFound, NotFound
+
+from .database.player import (
+    DbPlayer,
+    DeferredNamePlayerService,
+    PlayerCreate,
+    PlayerImport,
+    PlayerImportService,
+    PlayerService,
+    PlayerUpdate,
+    UnvalidatedPlayerService,
+    UppercasePlayerService,
+)
+from .database.queries import name_desc, name_is_first, name_is_missing, player_count, player_rows, players_by_id
 
-from sqlmodelservice import MultipleResultsFound, NotFound
 
-from .database.player import DbPlayer, PlayerCreate, PlayerService, PlayerUpdate
+@pytest.fixture(scope="module")
+def service(database: Engine) -> Generator[PlayerService, None, None]:
+    """Service that is shared by all tests of the module."""
+    with Session(database) as session:
+        yield PlayerService(session)
 
 
-@pytest.fixture(scope="function")
-def service(session: Session) -> PlayerService:
-    return PlayerService(session)
+def _truncate_players(session: Session) -> None:
+    """Deletes every player with a single statement and commits the session."""
+    session.execute(delete(DbPlayer))
+    session.commit()
 
 
-@pytest.fixture(scope="module")
-def query_session(engine: Engine) -> Generator[Session, None, None]:
-    """Secondary session only for querying data."""
-    with Session(engine) as session:
-        yield session
+def _count(session: Session) -> int:
+    """Returns the number of stored players."""
+    return session.exec(player_count).one()
 
 
-@pytest.fixture(scope="module")
+def _stored_players(query_service: PlayerService) -> Sequence[DbPlayer]:
+    """Returns the committed players, ordered by ID."""
+    # populate_existing makes sure already loaded players are refreshed.
+    return query_service.exec(players_by_id.execution_options(populate_existing=True)).all()
+
+
+def _seed(service: PlayerService, names: Iterable[str], *, commit: bool = True) -> None:
+    """Inserts players with the given names using a single statement and optionally commits the session."""
+    session = service._session
+    session.execute(insert(DbPlayer), [{"name": name} for name in names])
+    if commit:
+        session.commit()
+
+
+@pytest.fixture(autouse=True)
+def cleanup(service: PlayerService, query_session: Session) -> Generator[None, None, None]:
+    """Removes every player after each test, so tests don't depend on each other."""
+    yield
+    session = service._session
+    session.rollback()
+    _truncate_players(session)
+    session.expunge_all()
+    # The query session is shared by the whole test session, nothing it loaded may be reused.
+    query_session.expire_all()
+
+
+@pytest.fixture(scope="class")
+def seeded_service(service: PlayerService) -> Generator[PlayerService, None, None]:
+    """
+    The shared service, with players that are inserted once for every test of a class.
+
+    The players are never committed, they are only visible through the service.
+    """
+    _seed(service, ("First", "Second"), commit=False)
+    yield service
+    service._session.rollback()
+
+
+@pytest.fixture(scope="session")
 def query_service(query_session: Session) -> PlayerService:
     """Secondary service only for querying data."""
     return PlayerService(query_session)
 
 
 class TestAddToSession:
-    def test_all(self, service: PlayerService) -> None:
+    def test_create(self, service: PlayerService, query_service: PlayerService) -> None:
         service.add_to_session(
             (PlayerCreate(name="First"), PlayerCreate(name="Second")),
             operation="create",
-            commit=True,
+            commit=False,
         )
 
-        result = service.all(col(DbPlayer.name) == "First")
-        assert len(result) == 1
-        assert result[0].name == "First"
+        assert _count(query_service._session) == 0
 
-        result = service.all(order_by=(col(DbPlayer.name).desc(),))
-        assert len(result) == 2
-        assert result[0].name == "Second"
-        assert result[1].name == "First"
+        service.add_to_session((), commit=True, operation="update")
+        assert _count(query_service._session) == 2
+        assert _count(service._session) == 2
 
-        for player in service.all():
-            service.delete_by_pk(player.id)  # type: ignore[arg-type]
+    def test_create_bulk(self, service: PlayerService, query_service: PlayerService) -> None:
+        players = service.add_to_session(
+            (PlayerCreate(name="First"), PlayerCreate(name="Second")),
+            operation="create",
+            commit=True,
+            bulk=True,
+        )
 
-        assert len(service.get_all()) == 0
+        assert [p.name for p in players] == ["First", "Second"]
+        assert all(p.id is not None for p in players)
+        assert _count(query_service._session) == 2
 
-    def test_create(self, service: PlayerService, query_service: PlayerService) -> None:
-        service.add_to_session(
-            (PlayerCreate(name="First"), PlayerCreate(name="Second")),
+    def test_create_chunked(self, service: PlayerService, query_service: PlayerService) -> None:
+        players = service.add_to_session(
+            (PlayerCreate(name=f"Player {i}") for i in range(5)),
             operation="create",
             commit=False,
+            chunk_size=2,
         )
 
-        assert len(query_service.get_all()) == 0
+        assert len(players) == 5
+        assert _count(query_service._session) == 0
 
-        service.add_to_session((), commit=True, operation="update")
-        players = query_service.get_all()
-        assert len(players) == 2
-        assert len(service.get_all()) == 2
+        service._session.commit()
+        assert _count(query_service._session) == 5
+
+        with pytest.raises(ValueError):
+            service.add_to_session((), operation="create", chunk_size=0)
 
-        for player in players:
-            service.delete_by_pk(player.id)  # type: ignore[arg-type]
+    def test_create_without_validation(self, service: PlayerService, query_service: PlayerService) -> None:
+        unvalidated_service = UnvalidatedPlayerService(service._session)
 
-        assert len(query_service.get_all()) == 0
+        player = unvalidated_service.create(PlayerCreate(name="First"))
+        assert isinstance(player, DbPlayer)
+        assert player.id is not None
+
+        players = unvalidated_service.add_to_session(
+            (PlayerCreate(name="Second"), PlayerCreate(name="Third")),
+            operation="create",
+            commit=True,
+        )
+        assert all(isinstance(p, DbPlayer) for p in players)
+
+        players.extend(
+            unvalidated_service.add_to_session(
+                (PlayerCreate(name="Fourth"),), operation="create", commit=True, bulk=True
+            )
+        )
+
+        stored = query_service.exec(players_by_id).all()
+        assert [(p.id, p.name) for p in stored] == [
+            (player.id, "First"),
+            (players[0].id, "Second"),
+            (players[1].id, "Third"),
+            (players[2].id, "Fourth"),
+        ]
 
     def test_update(self, service: PlayerService, query_service: PlayerService) -> None:
+        _seed(service, ("First", "Second"))
+
+        # Players are sorted once in Python, instead of on every query.
+        by_name = attrgetter("name")
+        players = sorted(service.exec(service.select()).all(), key=by_name)
+        assert [p.name for p in players] == ["First", "Second"]
+
         service.add_to_session(
-            (PlayerCreate(name="First"), PlayerCreate(name="Second")),
+            ((p, PlayerUpdate(name=f"{p.name} - {i}")) for i, p in enumerate(players, 1)),
+            operation="update",
+            commit=False,
+        )
+
+        service._session.commit()
+
+        stored = sorted(_stored_players(query_service), key=by_name)
+        assert [p.name for p in stored] == ["First - 1", "Second - 2"]
+
+        # The main session must see the same data. Plain rows are enough to compare it.
+        rows = sorted(map(tuple, service._session.execute(player_rows).all()), key=itemgetter(1))
+        assert rows == [(p.id, p.name) for p in stored]
+
+    def test_update_bulk(self, service: PlayerService, query_service: PlayerService) -> None:
+        service.add_to_session(
+            (PlayerCreate(name="First"), PlayerCreate(name="Second"), PlayerCreate(name="Third")),
             operation="create",
             commit=True,
         )
 
-        players = query_service.exec(query_service.select().order_by(DbPlayer.name)).all()
-        assert players[0].name == "First"
-        assert players[1].name == "Second"
+        players = service.add_to_session(
+            ((p, PlayerUpdate(name=f"{p.name} - {i}")) for i, p in enumerate(service.exec(players_by_id).all(), 1)),
+            operation="update",
+            commit=True,
+            bulk=True,
+        )
+        assert [p.name for p in players] == ["First - 1", "Second - 2", "Third - 3"]
+
+        stored = _stored_players(query_service)
+        assert [p.name for p in stored] == ["First - 1", "Second - 2", "Third - 3"]
+
+    def test_update_bulk_fallbacks(self, service: PlayerService, query_service: PlayerService) -> None:
+        _seed(service, ("First", "Second", "Third", "Fourth"))
+        first, *others = service.exec(players_by_id).all()
 
+        # Repeated items get every change applied in order, like in the default flow.
         service.add_to_session(
             (
-                (p, PlayerUpdate(name=f"{p.name} - {i}"))
-                for i, p in enumerate(service.exec(service.select().order_by(DbPlayer.name)).all(), 1)
+                (first, PlayerUpdate(name="First - 1")),
+                *((p, PlayerUpdate(name=f"{p.name} - 1")) for p in others),
+                (first, PlayerUpdate(name="First - 2")),
             ),
             operation="update",
-            commit=False,
+            commit=True,
+            bulk=True,
         )
 
-        service.add_to_session((), commit=True, operation="create")
+        stored = _stored_players(query_service)
+        assert [p.name for p in stored] == ["First - 2", "Second - 1", "Third - 1", "Fourth - 1"]
 
-        query_service._session.expire_all()  # We need to make sure the data is fresh.
-        players = query_service.exec(query_service.select().order_by(DbPlayer.name)).all()
-        assert players[0].name == "First - 1"
-        assert players[1].name == "Second - 2"
-
-        # Simply comparing two lists would raise this exception (possible SQLModel bug):
-        # AttributeError: 'DbPlayer' object has no attribute '__pydantic_private__'
-        for first, second in zip(players, service.exec(service.select().order_by(DbPlayer.name)).all(), strict=True):
-            assert first.id == second.id
-            assert first.name == second.name
+        # Overridden hooks are applied to every item.
+        UppercasePlayerService(service._session).add_to_session(
+            ((p, PlayerUpdate(name=p.name)) for p in service.exec(players_by_id).all()),
+            operation="update",
+            commit=True,
+            bulk=True,
+        )
 
-        for player in players:
-            service.delete_by_pk(player.id)  # type: ignore[arg-type]
+        stored = _stored_players(query_service)
+        assert [p.name for p in stored] == ["FIRST - 2", "SECOND - 1", "THIRD - 1", "FOURTH - 1"]
 
-        assert len(query_service.get_all()) == 0
+    def test_update_bulk_stale(self, service: PlayerService, query_service: PlayerService) -> None:
+        _seed(service, ("First", "Second", "Third"))
+        players = service.exec(players_by_id).all()
 
-    def test_one(self, service: PlayerService) -> None:
-        service.add_to_session(
+        # Detached items are added to the session, like in the default flow.
+        service._session.expunge_all()
+        players = service.add_to_session(
+            ((p, PlayerUpdate(name=f"{p.name} - 1")) for p in players),
+            operation="update",
+            bulk=True,
+        )
+        assert all(p in service._session for p in players)
+        service._session.commit()
+
+        # Items whose row was deleted can't be updated, like in the default flow.
+        players = service.exec(players_by_id).all()
+        query_service._session.execute(delete(DbPlayer))
+        query_service._session.commit()
+
+        with pytest.raises(StaleDataError):
+            service.add_to_session(
+                ((p, PlayerUpdate(name=f"{p.name} - 2")) for p in players),
+                operation="update",
+                bulk=True,
+            )
+
+    def test_upsert(self, service: PlayerService, query_service: PlayerService) -> None:
+        first, second = service.add_to_session(
             (PlayerCreate(name="First"), PlayerCreate(name="Second")),
             operation="create",
             commit=True,
         )
+        import_service = PlayerImportService(service._session)
+
+        players = import_service.add_to_session(
+            (
+                PlayerImport(id=first.id, name="First - 1"),
+                PlayerImport(id=second.id, name="Second - 2"),
+                PlayerImport(name="Third"),
+            ),
+            operation="upsert",
+            commit=True,
+        )
+        assert [p.name for p in players] == ["First - 1", "Second - 2", "Third"]
+        assert players[0] is first
+        assert players[1] is second
+        assert players[2].id is not None
+
+        stored = _stored_players(query_service)
+        assert [p.name for p in stored] == ["First - 1", "Second - 2", "Third"]
+
+
+class TestCreate:
+    def test_create_conflict(self, service: PlayerService, query_service: PlayerService) -> None:
+        player = service.create(PlayerCreate(name="First"))
+        # The conflict must come from the database, not from the session's identity map.
+        service._session.expunge(player)
+        import_service = PlayerImportService(service._session)
+
+        with pytest.raises(CommitFailed):
+            import_service.create(PlayerImport(id=player.id, name="Duplicate"))
+
+        # The session is rolled back, so it can be used again.
+        service.create(PlayerCreate(name="Second"))
+        assert _count(query_service._session) == 2
+
+
+class TestUpdateAndDelete:
+    def test_update_and_delete_by_pk(self, service: PlayerService, query_service: PlayerService) -> None:
+        player = service.create(PlayerCreate(name="First"))
+        assert player.id is not None
+
+        updated = service.update(player.id, PlayerUpdate(name="Updated"))
+        assert updated.id == player.id
+        assert updated.name == "Updated"
+        assert query_service.one(col(DbPlayer.name) == "Updated").id == player.id
+
+        with pytest.raises(NotFound):
+            service.update(-1, PlayerUpdate(name="Does Not Exist"))
+
+        service.delete_by_pk(player.id)
+        with pytest.raises(NotFound):
+            service.delete_by_pk(player.id)
+
+        assert _count(query_service._session) == 0
+
+    def test_update_with_hook(self, service: PlayerService, query_service: PlayerService) -> None:
+        player = service.create(PlayerCreate(name="First"))
+        assert player.id is not None
+
+        updated = UppercasePlayerService(service._session).update(player.id, PlayerUpdate(name="Updated"))
+        assert updated.name == "UPDATED"
+        assert query_service.one(col(DbPlayer.id) == player.id).name == "UPDATED"
+
+
+class TestGetByPk:
+    def test_get_by_pk(self, service: PlayerService, query_service: PlayerService) -> None:
+        player = service.create(PlayerCreate(name="First"))
+        assert player.id is not None
+
+        loaded = query_service.get_by_pk(player.id)
+        assert loaded is not None
+        assert loaded.name == "First"
+
+        service.update(player.id, PlayerUpdate(name="Updated"))
+
+        cached = query_service.get_by_pk(player.id)
+        assert cached is loaded
+        assert cached.name == "First"
+
+        fresh = query_service.get_by_pk(player.id, fresh=True)
+        assert fresh is loaded
+        assert fresh.name == "Updated"
+
+        service.delete_by_pk(player.id)
+        assert service.get_by_pk(player.id) is None
+
 
-        result = service.one(col(DbPlayer.name) == "First")
+class TestLoaderOptions:
+    def test_loader_options(self, service: PlayerService) -> None:
+        player = service.create(PlayerCreate(name="First"))
+        assert player.id is not None
+        service._session.expunge_all()
+
+        deferred_service = DeferredNamePlayerService(service._session)
+        loaded = deferred_service.get_by_pk(player.id)
+        assert loaded is not None
+        assert "name" in instance_state(loaded).unloaded
+
+        service._session.expunge_all()
+        (loaded,) = deferred_service.all()
+        assert "name" in instance_state(loaded).unloaded
+        assert loaded.name == "First"
+
+
+class TestQueries:
+    """Read-only query tests that share the same stored players."""
+
+    @pytest.fixture(autouse=True)
+    def cleanup(self) -> None:
+        """Overrides the module's cleanup, the tests of the class don't change any data."""
+
+    def test_all(self, seeded_service: PlayerService) -> None:
+        service = seeded_service
+
+        result = service.all(name_is_first)
+        assert len(result) == 1
+        assert result[0].name == "First"
+
+        result = service.all(order_by=name_desc)
+        assert len(result) == 2
+        assert result[0].name == "Second"
+        assert result[1].name == "First"
+
+        result = service.all(order_by=name_desc, unique=True)
+        assert [p.name for p in result] == ["Second", "First"]
+
+    def test_one(self, seeded_service: PlayerService) -> None:
+        service = seeded_service
+
+        result = service.one(name_is_first)
         assert result.name == "First"
 
         with pytest.raises(NotFound):
-            service.one(col(DbPlayer.name) == "Does Not Exist")
+            service.one(name_is_missing)
 
         with pytest.raises(MultipleResultsFound):
             service.one(True)
 
-        for player in service.all():
-            service.delete_by_pk(player.id)  # type: ignore[arg-type]
-
-        assert len(service.get_all()) == 0
-
-    def test_one_or_none(self, service: PlayerService) -> None:
-        service.add_to_session(
-            (PlayerCreate(name="First"), PlayerCreate(name="Second")),
-            operation="create",
-            commit=True,
-        )
+    def test_one_or_none(self, seeded_service: PlayerService) -> None:
+        service = seeded_service
 
-        result = service.one_or_none(col(DbPlayer.name) == "First")
+        result = service.one_or_none(name_is_first)
         assert result is not None
         assert result.name == "First"
 
-        assert service.one_or_none(col(DbPlayer.name) == "Does Not Exist") is None
+        assert service.one_or_none(name_is_missing) is None
 
         with pytest.raises(MultipleResultsFound):
             service.one_or_none(True)
 
-        for player in service.all():
-            service.delete_by_pk(player.id)  # type: ignore[arg-type]
+    def test_iter_all(self, seeded_service: PlayerService) -> None:
+        service = seeded_service
+
+        result = list(service.iter_all(order_by=name_desc, chunk_size=1))
+        assert [p.name for p in result] == ["Second", "First"]
+
+        result = list(service.iter_all(name_is_first, chunk_size=1))
+        assert len(result) == 1
+        assert result[0].name == "First"
+
+    def test_all_as_dicts(self, seeded_service: PlayerService) -> None:
+        service = seeded_service
+        first = service.one(name_is_first)
+
+        result = service.all_as_dicts(name_is_first)
+        assert len(result) == 1
+        assert dict(result[0]) == {"id": first.id, "name": "First"}
 
-        assert len(service.get_all()) == 0
+        result = service.all_as_dicts(order_by=name_desc)
+        assert [r["name"] for r in result] == ["Second", "First"]